@@ -1,12 +1,18 @@
 # modules/items/routes/analytics.py
 
-from typing import List, Dict
+from typing import Any, List, Dict, Optional, Tuple
+from array import array
 from collections import Counter, defaultdict
+import hashlib
+import json
 import re
+import threading
+import time
 
-from fastapi import APIRouter, Depends, Query
+import numpy as np
+from fastapi import APIRouter, Depends, Header, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from pydantic import BaseModel
 
 from database import get_db
@@ -28,28 +34,86 @@ class WordFrequency(BaseModel):
     freq: int
 
 
+# =======================
+#  CACHE HASIL ANALYTICS
+# =======================
+
+# cache sederhana in-process: key -> (waktu kedaluwarsa, nilai).
+# Endpoint sync jalan di threadpool FastAPI, jadi semua akses lewat _cache_lock.
+CACHE_TTL_SECONDS = 30
+_cache: Dict[str, Tuple[float, Any]] = {}
+_cache_lock = threading.Lock()
+
+
+def _cache_get(key: str) -> Optional[Any]:
+    with _cache_lock:
+        hit = _cache.get(key)
+    if hit is None or hit[0] <= time.monotonic():
+        return None
+    return hit[1]
+
+
+def _cache_set(key: str, value: Any) -> None:
+    now = time.monotonic()
+    with _cache_lock:
+        # buang entri kedaluwarsa supaya key lama (mis. versi top-words) tidak numpuk
+        for k in [k for k, (exp, _) in _cache.items() if exp <= now]:
+            del _cache[k]
+        _cache[key] = (now + CACHE_TTL_SECONDS, value)
+
+
+def invalidate_analytics_cache() -> None:
+    """
+    Mengosongkan cache analytics.
+    Dipanggil dari route create/update/delete setelah commit.
+    """
+    with _cache_lock:
+        _cache.clear()
+
+
 # =======================
 # 1. DISTRIBUSI SENTIMEN
 # =======================
 
 @router.get("/analytics/distribution", response_model=Dict[str, int])
-def sentiment_distribution(db: Session = Depends(get_db)):
+def sentiment_distribution(
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
     """
     Mengembalikan distribusi jumlah data per kategori status.
     Melewati baris dengan status kosong / NULL.
+
+    Hasil di-cache selama CACHE_TTL_SECONDS dan diberi weak ETag;
+    client yang mengirim If-None-Match yang cocok dapat 304.
     """
-    rows = (
-        db.query(
+    cached = _cache_get("distribution")
+    if cached is None:
+        cached = _compute_distribution(db)
+        _cache_set("distribution", cached)
+
+    result, etag = cached
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return result
+
+
+def _compute_distribution(db: Session) -> Tuple[Dict[str, int], str]:
+    stmt = (
+        select(
             MentalHealthResponse.status,
             func.count(MentalHealthResponse.id),
         )
-        .filter(
+        .where(
             MentalHealthResponse.status.isnot(None),
             MentalHealthResponse.status != ""
         )
         .group_by(MentalHealthResponse.status)
-        .all()
     )
+    rows = db.execute(stmt).all()
 
     result: Dict[str, int] = {}
     for status, count in rows:
@@ -58,14 +122,16 @@ def sentiment_distribution(db: Session = Depends(get_db)):
             continue
         result[status_norm] = int(count)
 
-    return result
+    payload = json.dumps(result, sort_keys=True).encode()
+    etag = 'W/"%s"' % hashlib.blake2b(payload, digest_size=8).hexdigest()
+    return result, etag
 
 # =======================
 #  UTIL: STOPWORDS & REGEX
 # =======================
 
 # daftar stopword sederhana; silakan modif kalau datanya bahasa Indonesia
-STOPWORDS = {
+STOPWORDS = frozenset({
     "i", "me", "my", "myself", "we", "our", "ours", "ourselves",
     "you", "your", "yours", "yourself", "yourselves",
     "he", "him", "his", "himself",
@@ -89,9 +155,26 @@ STOPWORDS = {
     "some", "such", "no", "nor", "not", "only", "own",
     "same", "so", "than", "too", "very",
     "can", "will", "just", "should", "now",
-}
+})
+
+# hanya kata >= 3 karakter; filter panjang dikerjakan oleh regex engine.
+# re.ASCII: clean_statement hasil normalisasi() sudah ASCII saja,
+# jadi \w dan \b tidak perlu cek tabel Unicode per karakter.
+WORD_RE = re.compile(r"\b\w{3,}\b", re.ASCII)
 
-WORD_RE = re.compile(r"\b\w+\b")
+
+def _tokenize(
+    text: str,
+    _findall=WORD_RE.findall,
+    _stop=STOPWORDS,
+) -> list[str]:
+    """
+    Tokenisasi + filter stopword untuk satu teks.
+
+    `_findall` dan `_stop` di-bind sebagai default argument supaya jadi
+    variabel lokal (bukan lookup global/atribut per token); jangan diisi.
+    """
+    return [w for w in _findall(text.lower()) if w not in _stop]
 
 
 # =========================================
@@ -114,44 +197,65 @@ def top_words_per_category(
     """
     Top kata per kategori, berbasis `clean_statement`,
     melewati status kosong.
+
+    Hasil di-cache per `top_n` selama CACHE_TTL_SECONDS. Key juga memuat
+    MAX(id), jadi insert dari worker lain langsung membuat cache baru.
     """
-    rows = (
-        db.query(
+    version = _data_version(db)
+    cache_key = f"top-words:{top_n}:{version}"
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return cached
+
+    result = _compute_top_words(db, top_n)
+    _cache_set(cache_key, result)
+    return result
+
+
+def _data_version(db: Session) -> int:
+    # MAX(id) sebagai penanda versi data (dijawab langsung dari primary key)
+    return db.execute(
+        select(func.max(MentalHealthResponse.id))
+    ).scalar() or 0
+
+
+def _compute_top_words(
+    db: Session, top_n: int
+) -> Dict[str, List[Dict[str, Any]]]:
+    stmt = (
+        select(
             MentalHealthResponse.status,
             MentalHealthResponse.clean_statement,
         )
-        .filter(
+        .where(
             MentalHealthResponse.status.isnot(None),
             MentalHealthResponse.status != "",
             MentalHealthResponse.clean_statement.isnot(None),
             MentalHealthResponse.clean_statement != "",
         )
-        .all()
+        .execution_options(stream_results=True)
     )
+    # Core select (tanpa ORM Query) -> baris tuple mentah, di-stream per batch
+    rows = db.execute(stmt).yield_per(2000)
 
-    texts_by_status: Dict[str, List[str]] = {}
+    # baris di-stream per batch dan langsung dihitung,
+    # tanpa menampung semua teks di memori
+    counters: Dict[str, Counter] = defaultdict(Counter)
+    tokenize = _tokenize
     for status, clean_text in rows:
         status_norm = status.strip()
         if not status_norm:
             continue
-        texts_by_status.setdefault(status_norm, []).append(clean_text or "")
+        counters[status_norm].update(tokenize(clean_text or ""))
 
-    result: Dict[str, List[WordFrequency]] = {}
-
-    for status, texts in texts_by_status.items():
-        counter = Counter()
-
-        for text in texts:
-            words = WORD_RE.findall(text.lower())
-            words = [
-                w for w in words
-                if w not in STOPWORDS and len(w) > 2
-            ]
-            counter.update(words)
+    # dict biasa (bukan objek WordFrequency); serialisasi dikerjakan
+    # FastAPI/Pydantic lewat response_model
+    result: Dict[str, List[Dict[str, Any]]] = {}
 
+    for status, counter in counters.items():
         most_common = counter.most_common(top_n)
         result[status] = [
-            WordFrequency(word=w, freq=int(c))
+            {"word": w, "freq": c}
             for w, c in most_common
         ]
 
@@ -169,51 +273,50 @@ def length_stats_per_category(db: Session = Depends(get_db)):
     Mengembalikan median panjang kalimat (jumlah kata) per kategori,
     berbasis clean_statement, melewati status kosong dan teks kosong,
     serta mengabaikan outlier super panjang (misal > 400 kata).
+
+    Hasil di-cache selama CACHE_TTL_SECONDS (dikosongkan saat ada write).
     """
-    rows = (
-        db.query(
+    cached = _cache_get("length-stats")
+    if cached is not None:
+        return cached
+
+    result = _compute_length_stats(db)
+    _cache_set("length-stats", result)
+    return result
+
+
+def _compute_length_stats(db: Session) -> Dict[str, float]:
+    # word_count adalah generated column (dihitung MySQL saat insert/update),
+    # jadi yang ditarik dari DB cuma satu integer per baris, bukan teks penuh.
+    # Baris dengan clean_statement NULL/kosong punya word_count 0 -> ikut tersaring.
+    stmt = (
+        select(
             MentalHealthResponse.status,
-            MentalHealthResponse.clean_statement,
+            MentalHealthResponse.word_count,
         )
-        .filter(
+        .where(
             MentalHealthResponse.status.isnot(None),
             MentalHealthResponse.status != "",
-            MentalHealthResponse.clean_statement.isnot(None),
-            MentalHealthResponse.clean_statement != "",
+            # abaikan outlier super panjang (opsional, bisa kamu atur threshold-nya)
+            MentalHealthResponse.word_count.between(1, 400),
         )
-        .all()
+        .execution_options(stream_results=True)
     )
+    rows = db.execute(stmt).yield_per(2000)
 
-    lengths_by_status: Dict[str, List[int]] = defaultdict(list)
+    # ditampung langsung di array C int (4 byte/elemen), bukan list of int
+    lengths_by_status: Dict[str, array] = defaultdict(lambda: array("i"))
 
-    for status, clean_text in rows:
+    for status, n_words in rows:
         status_norm = status.strip()
         if not status_norm:
             continue
-
-        text = clean_text or ""
-        n_words = len(text.split())
-
-        # abaikan outlier super panjang (opsional, bisa kamu atur threshold-nya)
-        if n_words == 0 or n_words > 400:
-            continue
-
         lengths_by_status[status_norm].append(n_words)
 
-    import math
-
     result: Dict[str, float] = {}
     for status, lengths in lengths_by_status.items():
-        if not lengths:
-            continue
-        lengths_sorted = sorted(lengths)
-        m = len(lengths_sorted)
-        mid = m // 2
-
-        if m % 2 == 1:
-            median = lengths_sorted[mid]
-        else:
-            median = (lengths_sorted[mid - 1] + lengths_sorted[mid]) / 2
+        # np.median pakai partisi (O(n)); frombuffer tanpa copy dari array
+        median = np.median(np.frombuffer(lengths, dtype=np.intc))
 
         result[status] = round(float(median), 2)
 
@@ -233,17 +336,16 @@ def examples_by_category(
     Contoh kalimat untuk satu kategori tertentu,
     pakai `clean_statement`.
     """
-    rows = (
-        db.query(MentalHealthResponse.clean_statement)
-        .filter(
+    stmt = (
+        select(MentalHealthResponse.clean_statement)
+        .where(
             MentalHealthResponse.status == status,
             MentalHealthResponse.clean_statement.isnot(None),
             MentalHealthResponse.clean_statement != "",
         )
         .order_by(MentalHealthResponse.id)
         .limit(n)
-        .all()
     )
 
-    examples = [txt for (txt,) in rows if txt]
+    examples = [txt for txt in db.execute(stmt).scalars() if txt]
     return examples
\ No newline at end of file
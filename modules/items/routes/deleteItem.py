@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 
 from database import get_db
 from modules.items.schema.models import MentalHealthResponse
+from modules.items.routes.analytics import invalidate_analytics_cache
 
 router = APIRouter(
     prefix="/mental-health",
@@ -33,4 +34,5 @@ def delete_response(response_id: int, db: Session = Depends(get_db)):
 
     db.delete(obj)
     db.commit()
+    invalidate_analytics_cache()
     # Tidak perlu return body untuk 204
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 
 from database import get_db
 from modules.items.schema.models import MentalHealthResponse
+from modules.items.routes.analytics import invalidate_analytics_cache
 from modules.items.schema.schemas import MentalHealthUpdate, MentalHealthOut
 from modules.items.ml.services.predict_xgb import predict_text
 
@@ -52,6 +53,7 @@ def update_response(
     obj.status = payload.status
 
     db.commit()
+    invalidate_analytics_cache()
     db.refresh(obj)
 
     return _to_out(obj)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text
+from sqlalchemy import Column, Computed, Integer, String, Text
 from database import Base
 
 # Model ORM untuk tabel mental_health_responses
@@ -9,3 +9,18 @@ class MentalHealthResponse(Base):
     statement = Column(Text, nullable=False)
     clean_statement = Column(Text, nullable=True)
     status = Column(String(50), nullable=False, index=True)
+
+    # Jumlah kata clean_statement, dihitung MySQL saat insert/update (STORED).
+    # clean_statement hasil normalisasi() sudah 1 spasi antar kata & di-strip,
+    # jadi cukup hitung spasi + 1. Dump di sql/ sudah memuat kolom ini;
+    # untuk tabel yang dibuat dari dump lama jalankan sql/add_word_count.sql.
+    # Sengaja tanpa index: filter 1..400 kata cocok untuk hampir semua baris.
+    word_count = Column(
+        Integer,
+        Computed(
+            "CASE WHEN clean_statement IS NULL OR clean_statement = '' THEN 0 "
+            "ELSE CHAR_LENGTH(clean_statement) "
+            "- CHAR_LENGTH(REPLACE(clean_statement, ' ', '')) + 1 END",
+            persisted=True,
+        ),
+    )
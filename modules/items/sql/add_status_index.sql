@@ -0,0 +1,11 @@
+-- Index status untuk tabel hasil import dump lama (dump lama hanya punya
+-- PRIMARY KEY, sedangkan MentalHealthResponse.status di schema/models.py pakai
+-- index=True). Dump "mental health dataset.sql" sekarang sudah memuatnya.
+-- Di InnoDB setiap secondary index otomatis membawa primary key, jadi index ini
+-- efektif (status, id): query /analytics/examples
+-- (WHERE status = ? ORDER BY id LIMIT n) tidak perlu sort lagi,
+-- dan GROUP BY status di /analytics/distribution bisa jalan di index saja.
+-- clean_statement (TEXT) tidak bisa ikut di-cover; MySQL tidak punya INCLUDE.
+
+CREATE INDEX `ix_mental_health_responses_status`
+  ON `mental_health_responses` (`status`);
@@ -0,0 +1,14 @@
+-- Tambah kolom word_count (jumlah kata clean_statement) ke tabel yang dibuat
+-- dari dump lama (dump "mental health dataset.sql" sekarang sudah memuatnya).
+-- Wajib dijalankan sebelum app dipakai: model ORM memetakan kolom ini,
+-- jadi semua query CRUD gagal ("Unknown column") kalau kolomnya belum ada.
+-- Generated column STORED: nilai lama langsung terisi saat ALTER,
+-- dan insert/update berikutnya dihitung otomatis oleh MySQL.
+-- Ekspresi harus sama dengan MentalHealthResponse.word_count di schema/models.py.
+
+ALTER TABLE `mental_health_responses`
+  ADD COLUMN `word_count` int GENERATED ALWAYS AS (
+    CASE WHEN `clean_statement` IS NULL OR `clean_statement` = '' THEN 0
+    ELSE CHAR_LENGTH(`clean_statement`)
+      - CHAR_LENGTH(REPLACE(`clean_statement`, ' ', '')) + 1 END
+  ) STORED;